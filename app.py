@@ -5,11 +5,23 @@ Versão PRO: Multi-escola, Multi-perfil, WhatsApp (Z-API), Email (Gmail)
 from flask import Flask, render_template, request, jsonify, send_file, session, redirect, url_for
 from datetime import datetime
 from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas as pdf_canvas
 from pathlib import Path
 from functools import wraps
-import json, os, urllib.request, urllib.parse, smtplib, ssl
+from collections import OrderedDict
+from contextlib import contextmanager
+# reportlab, smtplib/ssl e urllib.request são importados só quando usados
+# (/report.pdf e envio de notificações) — boot do worker mais rápido
+import json, os, gzip, hashlib, threading, socket, atexit, tempfile, time, math, stat
+
+# Dependências opcionais — o sistema funciona sem elas
+try:
+    import orjson  # serialização JSON mais rápida
+except ImportError:
+    orjson = None
+try:
+    import brotli  # compressão "br" para navegadores modernos
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "profsafe24-seguranca-escolar-2026")
@@ -34,6 +46,28 @@ try:
 except ImportError:
     pass  # werkzeug não instalado — ignora sem quebrar
 
+if orjson:
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """Usa orjson nas respostas jsonify() quando disponível."""
+        def dumps(self, obj, **kwargs):
+            opcoes = orjson.OPT_SORT_KEYS if kwargs.get("sort_keys", self.sort_keys) else 0
+            try:
+                return orjson.dumps(obj, default=self.default, option=opcoes).decode("utf-8")
+            except TypeError:
+                # Chaves não-str: o json padrão converte e ordena de outro jeito
+                return super().dumps(obj, **kwargs)
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
+# JSON das respostas: compacto e UTF-8 puro (emojis não viram \uXXXX)
+app.json.compact      = True
+app.json.ensure_ascii = False
+
 # ============================================================
 # CONFIGURAÇÃO DO ESTADO — MUDE APENAS NO RENDER (ENV VARS)
 # ============================================================
@@ -58,6 +92,43 @@ ESCOLAS_FILE = BASE_DIR / "escolas.json"
 ALERTS_FILE  = BASE_DIR / "alertas.json"
 STATE_FILE   = BASE_DIR / "state.json"
 
+def _diretorio_privado(caminho):
+    """Cria (modo 0700) e valida um diretório só do usuário atual.
+
+    Retorna False se o caminho for link, não for diretório ou pertencer
+    a outro usuário — em /tmp qualquer um poderia criá-lo antes.
+    """
+    try:
+        caminho.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = caminho.lstat()
+        if stat.S_ISLNK(st.st_mode) or not stat.S_ISDIR(st.st_mode):
+            return False
+        if hasattr(os, "getuid") and st.st_uid != os.getuid():
+            return False
+        if st.st_mode & 0o077:
+            os.chmod(caminho, 0o700)
+        return True
+    except OSError:
+        return False
+
+_runtime_dir = None
+
+def _caminho_temp(nome):
+    """Caminho para sockets/locks desta instalação, num diretório privado.
+
+    Usa /tmp/profsafe24-<chave>; se ele não for seguro, usa BASE_DIR/.profsafe24.
+    """
+    global _runtime_dir
+    if _runtime_dir is None:
+        chave = hashlib.sha1(str(BASE_DIR).encode("utf-8")).hexdigest()[:8]
+        diretorio = Path(tempfile.gettempdir()) / f"profsafe24-{chave}"
+        if not _diretorio_privado(diretorio):
+            print(f"[SEGURANÇA] ⚠️  {diretorio} pertence a outro usuário — usando {BASE_DIR / '.profsafe24'}")
+            diretorio = BASE_DIR / ".profsafe24"
+            _diretorio_privado(diretorio)
+        _runtime_dir = diretorio
+    return _runtime_dir / nome
+
 # ============================================================
 # CONFIGURAÇÕES DE NOTIFICAÇÃO (variáveis de ambiente)
 # ============================================================
@@ -102,13 +173,21 @@ def _check_notif_config():
 def _read(path, default):
     try:
         if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
+            raw = path.read_bytes()
+            return orjson.loads(raw) if orjson else json.loads(raw)
     except Exception:
         pass
     return default
 
 def _write(path, data):
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Formato compacto: sem indentação o alertas.json fica ~17% menor
+    if orjson:
+        try:
+            path.write_bytes(orjson.dumps(data))
+            return
+        except TypeError:
+            pass  # chaves não-str — mesmo resultado do json padrão abaixo
+    path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
 
 def load_users():    return _read(USERS_FILE,   {})
 def load_escolas():  return _read(ESCOLAS_FILE, {})
@@ -120,6 +199,180 @@ def save_escolas(d): _write(ESCOLAS_FILE, d)
 def save_alertas(d): _write(ALERTS_FILE,  d)
 def save_state(d):   _write(STATE_FILE,   d)
 
+# ============================================================
+# BARRAMENTO DE EVENTOS (entre workers e entre instâncias)
+# ============================================================
+# Com "gunicorn --workers 2" cada worker tem sua própria memória:
+# um alerta gravado pelo worker A não invalida os caches do B.
+# Eventos publicados aqui chegam a todos os workers em milissegundos:
+#   alert.created · alert.resolved · alerts.cleared · siren.changed
+#
+# Backend escolhido por EVENT_BUS_URL:
+#   (vazio) / unix:///dir → sockets Unix no mesmo host (padrão)
+#   redis://host:6379/0   → Redis pub/sub (várias instâncias no Render)
+class EventBusLocal:
+    """Entrega eventos apenas dentro do processo atual."""
+
+    def __init__(self):
+        self._assinantes = {}
+        self._lock = threading.Lock()
+        self._pid  = None
+
+    @property
+    def origem(self):
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def assinar(self, evento, fn):
+        """Registra fn(evento, dados); use "*" para receber todos."""
+        with self._lock:
+            self._assinantes.setdefault(evento, []).append(fn)
+
+    def publicar(self, evento, dados=None):
+        msg = {"evento": evento, "dados": dados or {}, "origem": self.origem}
+        self._entregar(msg)
+        self._enviar(msg)
+
+    def iniciar(self):
+        """Abre o canal de recepção (uma vez por processo, seguro após fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._conectar()
+                self._pid = os.getpid()
+
+    def _conectar(self):
+        pass
+
+    def _enviar(self, msg):
+        pass
+
+    def _receber(self, raw):
+        try:
+            msg = json.loads(raw)
+        except Exception:
+            return
+        if not isinstance(msg, dict) or not isinstance(msg.get("evento"), str):
+            return  # mensagem malformada — descarta
+        if msg.get("origem") != self.origem:
+            self._entregar(msg)
+
+    def _entregar(self, msg):
+        evento = msg.get("evento")
+        fns = self._assinantes.get(evento, []) + self._assinantes.get("*", [])
+        for fn in fns:
+            try:
+                fn(evento, msg.get("dados", {}))
+            except Exception as e:
+                print(f"[BUS] ❌ Erro no assinante de {evento}: {e}")
+
+class EventBusUnix(EventBusLocal):
+    """Um socket Unix (datagrama) por worker num diretório compartilhado."""
+
+    def __init__(self, diretorio):
+        super().__init__()
+        self.diretorio = Path(diretorio)
+        self._sock     = None
+        self._caminho  = None
+
+    def _conectar(self):
+        if not _diretorio_privado(self.diretorio):
+            print(f"[BUS] ❌ {self.diretorio} não é um diretório privado deste usuário — "
+                  f"eventos ficam restritos a este processo")
+            return
+        caminho = self.diretorio / f"{os.getpid()}.sock"
+        caminho.unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(caminho))
+        self._sock, self._caminho = sock, caminho
+        atexit.register(caminho.unlink, missing_ok=True)
+        threading.Thread(target=self._escutar, args=(sock,), daemon=True,
+                         name="event-bus").start()
+
+    def _escutar(self, sock):
+        while True:
+            try:
+                raw = sock.recv(65536)
+            except OSError:
+                return
+            try:
+                self._receber(raw)
+            except Exception as e:
+                print(f"[BUS] ❌ Mensagem descartada: {e}")  # não derruba o listener
+
+    def _enviar(self, msg):
+        self.iniciar()
+        if self._sock is None:
+            return
+        raw = json.dumps(msg, ensure_ascii=False).encode("utf-8")
+        for destino in self.diretorio.glob("*.sock"):
+            if destino == self._caminho:
+                continue
+            try:
+                self._sock.sendto(raw, socket.MSG_DONTWAIT, str(destino))
+            except (ConnectionRefusedError, FileNotFoundError):
+                destino.unlink(missing_ok=True)  # worker que já morreu
+            except BlockingIOError:
+                pass  # fila do destino cheia — processo parado, não bloqueia o alerta
+            except OSError as e:
+                print(f"[BUS] ❌ Falha ao enviar para {destino.name}: {e}")
+
+class EventBusRedis(EventBusLocal):
+    """Redis pub/sub. Aceita qualquer cliente com publish() e pubsub()."""
+    CANAL = "profsafe24:eventos"
+
+    def __init__(self, cliente):
+        super().__init__()
+        self.cliente = cliente
+
+    def _conectar(self):
+        pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.CANAL)
+        threading.Thread(target=self._escutar, args=(pubsub,), daemon=True,
+                         name="event-bus").start()
+
+    def _escutar(self, pubsub):
+        try:
+            for m in pubsub.listen():
+                if m.get("type") == "message":
+                    try:
+                        self._receber(m["data"])
+                    except Exception as e:
+                        print(f"[BUS] ❌ Mensagem descartada: {e}")
+        except Exception as e:
+            print(f"[BUS] ❌ Conexão Redis perdida: {e}")
+            self._pid = None  # reconecta no próximo iniciar()
+
+    def _enviar(self, msg):
+        self.iniciar()
+        try:
+            self.cliente.publish(self.CANAL, json.dumps(msg, ensure_ascii=False))
+        except Exception as e:
+            print(f"[BUS] ❌ Falha ao publicar {msg['evento']}: {e}")
+
+def _criar_event_bus():
+    url = os.environ.get("EVENT_BUS_URL", "")
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+            return EventBusRedis(redis.Redis.from_url(url))
+        except ImportError:
+            print("[BUS] ⚠️  Pacote redis não instalado — usando sockets Unix")
+    if hasattr(socket, "AF_UNIX"):
+        if url.startswith("unix://"):
+            diretorio = url[len("unix://"):]
+        else:
+            diretorio = _caminho_temp("bus")  # já dentro do diretório privado
+        return EventBusUnix(diretorio)
+    return EventBusLocal()
+
+event_bus = _criar_event_bus()
+
+@app.before_request
+def _iniciar_event_bus():
+    # Só dentro do worker: com --preload o master não deve abrir o socket
+    event_bus.iniciar()
+
 # ============================================================
 # DADOS DE DEMONSTRAÇÃO (cria na 1ª execução)
 # ============================================================
@@ -190,9 +443,6 @@ def seed_demo_data():
         }
         save_users(users)
 
-seed_demo_data()
-_check_notif_config()
-
 # FIX: Sempre atualiza WhatsApp/Email dos perfis globais com variáveis de ambiente
 def _sync_notif_contacts():
     users = load_users()
@@ -216,8 +466,64 @@ def _sync_notif_contacts():
         save_users(users)
         print("✅ Contatos de notificação sincronizados com variáveis de ambiente")
 
-_sync_notif_contacts()
-_check_notif_config()
+# ============================================================
+# INICIALIZAÇÃO (app factory)
+# ============================================================
+# Importar app.py não lê nem grava nada. A fase abaixo roda uma vez
+# por processo — ou uma vez no total com "gunicorn --preload", já que
+# os workers herdam o estado do master. O flock impede que workers
+# subindo em paralelo disputem users.json / escolas.json.
+_inicializado = False
+_init_lock    = threading.Lock()
+
+def _flock(arq, esperar=True):
+    """flock exclusivo em arq (liberado ao fechar). Sem fcntl (Windows) o
+    processo é único e a trava é sempre concedida."""
+    try:
+        import fcntl
+    except ImportError:
+        return True
+    try:
+        fcntl.flock(arq, fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+@contextmanager
+def _trava_entre_processos(nome):
+    with open(_caminho_temp(f"{nome}.lock"), "w") as arq:
+        _flock(arq)
+        yield
+
+def inicializar():
+    """Dados de demo, contatos de notificação e log de configuração (uma vez)."""
+    global _inicializado
+    if _inicializado:
+        return
+    with _init_lock:
+        if _inicializado:
+            return
+        with _trava_entre_processos("init"):
+            seed_demo_data()
+            _sync_notif_contacts()
+        _check_notif_config()
+        _inicializado = True
+
+def create_app():
+    """Ponto de entrada do gunicorn: gunicorn "app:create_app()" --preload
+
+    Não é uma factory completa: app, event_bus, escalonador e caches são
+    globais do módulo e toda chamada devolve o mesmo app. A função só
+    concentra a inicialização (dados de demo, contatos, logs) numa fase
+    explícita, fora do import; os testes trocam os globais via monkeypatch.
+    """
+    inicializar()
+    return app
+
+@app.before_request
+def _garantir_inicializado():
+    # Cobre quem ainda sobe com "gunicorn app:app" (sem a factory)
+    inicializar()
 
 # ============================================================
 # AUTENTICAÇÃO
@@ -242,15 +548,126 @@ def role_required(*roles):
         return decorated
     return decorator
 
+# ============================================================
+# LEDGER DE ENTREGAS (WhatsApp / Email)
+# ============================================================
+# Cada tentativa de notificação vira uma linha em entregas.jsonl
+# (append-only, sobrevive a redeploy com disco persistente). Índices
+# em memória guardam só a posição de cada linha por alerta e por
+# destinatário; linhas gravadas por outros workers são lidas na
+# próxima consulta, a partir do último byte já indexado.
+# Ao passar de ENTREGAS_MAX_MB o arquivo vira entregas.jsonl.1 (um só
+# histórico); consultas cobrem apenas o arquivo atual, e os índices
+# nunca crescem além dele.
+ENTREGAS_FILE    = BASE_DIR / "entregas.jsonl"
+ENTREGAS_MAX_MB  = float(os.environ.get("ENTREGAS_MAX_MB", "20"))
+
+class LedgerEntregas:
+    """Registro append-only das notificações, indexado por alerta e destinatário."""
+
+    def __init__(self, path, max_bytes=int(ENTREGAS_MAX_MB * 1024 * 1024)):
+        self.path      = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._limpar_indices()
+
+    def _limpar_indices(self):
+        self._inode            = None
+        self._indexado         = 0
+        self._por_alerta       = {}
+        self._por_destinatario = {}
+
+    def registrar(self, registro):
+        linha = json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+        try:
+            # Uma única escrita com O_APPEND: linhas de workers diferentes não se misturam
+            with open(self.path, "ab") as f:
+                f.write(linha.encode("utf-8"))
+                tamanho = f.tell()
+            if self.max_bytes and tamanho > self.max_bytes:
+                self._rotacionar()
+        except OSError as e:
+            print(f"[LEDGER] ❌ Falha ao gravar entrega: {e}")
+
+    def _rotacionar(self):
+        with _trava_entre_processos("entregas"):
+            # Outro worker pode ter rotacionado enquanto esperávamos a trava
+            if self.path.stat().st_size > self.max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+
+    def por_alerta(self, alerta_id):
+        return self._consultar("_por_alerta", alerta_id)
+
+    def por_destinatario(self, destinatario):
+        return self._consultar("_por_destinatario", destinatario)
+
+    def _consultar(self, nome_indice, chave):
+        # Índice e leitura usam o mesmo descritor: uma rotação no meio da
+        # consulta não mistura posições de um arquivo com o conteúdo de outro
+        with self._lock:
+            try:
+                f = open(self.path, "rb")
+            except FileNotFoundError:
+                self._limpar_indices()
+                return []
+            with f:
+                self._sincronizar(f)
+                registros = []
+                for pos in getattr(self, nome_indice).get(chave, ()):
+                    f.seek(pos)
+                    registros.append(json.loads(f.readline()))
+        return registros
+
+    def _sincronizar(self, f):
+        st = os.fstat(f.fileno())
+        if st.st_ino != self._inode or st.st_size < self._indexado:
+            self._limpar_indices()  # arquivo rotacionado ou recriado
+            self._inode = st.st_ino
+        if st.st_size == self._indexado:
+            return
+        f.seek(self._indexado)
+        while True:
+            pos   = f.tell()
+            linha = f.readline()
+            if not linha.endswith(b"\n"):
+                break  # linha ainda sendo gravada — indexa na próxima consulta
+            try:
+                reg = json.loads(linha)
+            except ValueError:
+                reg = {}
+            self._por_alerta.setdefault(reg.get("alerta_id"), []).append(pos)
+            self._por_destinatario.setdefault(reg.get("destinatario"), []).append(pos)
+            self._indexado = f.tell()
+
+ledger_entregas = LedgerEntregas(ENTREGAS_FILE)
+
+def _registrar_entrega(contexto, canal, destinatario, resultado, resposta, inicio):
+    contexto = contexto or {}
+    ledger_entregas.registrar({
+        "alerta_id":    contexto.get("alerta_id"),
+        "usuario":      contexto.get("usuario", ""),
+        "escola_id":    contexto.get("escola_id"),
+        "perfil":       contexto.get("perfil", ""),
+        "canal":        canal,
+        "destinatario": destinatario,
+        "latencia_ms":  round((time.perf_counter() - inicio) * 1000),
+        "resultado":    resultado,
+        "resposta":     str(resposta)[:300],
+        "time":         datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+    })
+
 # ============================================================
 # NOTIFICAÇÕES
 # ============================================================
-def enviar_whatsapp(numero, mensagem):
+def enviar_whatsapp(numero, mensagem, contexto=None):
     """Envia WhatsApp via Z-API. Ignora se não configurado."""
+    inicio = time.perf_counter()
     if not ZAPI_INSTANCE or not ZAPI_TOKEN or not numero:
         print(f"[ZAPI] Ignorado — não configurado ou número vazio ({numero})")
+        _registrar_entrega(contexto, "whatsapp", numero, "ignorado", "Z-API não configurada", inicio)
         return False
     try:
+        import urllib.request
         # Remove caracteres não numéricos do número
         numero_limpo = "".join(filter(str.isdigit, numero))
         url     = f"https://api.z-api.io/instances/{ZAPI_INSTANCE}/token/{ZAPI_TOKEN}/send-text"
@@ -266,17 +683,22 @@ def enviar_whatsapp(numero, mensagem):
         resp = urllib.request.urlopen(req, timeout=10)
         body = resp.read().decode("utf-8")
         print(f"[ZAPI] ✅ Resposta: {body}")
+        _registrar_entrega(contexto, "whatsapp", numero, "enviado", body, inicio)
         return True
     except Exception as e:
         print(f"[ZAPI] ❌ Erro ao enviar para {numero}: {e}")
+        _registrar_entrega(contexto, "whatsapp", numero, "falhou", e, inicio)
         return False
 
-def enviar_email(destinatario, assunto, corpo):
+def enviar_email(destinatario, assunto, corpo, contexto=None):
     """Envia email via Gmail. Ignora se não configurado."""
+    inicio = time.perf_counter()
     if not GMAIL_USER or not GMAIL_PASS or not destinatario:
         print(f"[Gmail] Ignorado — não configurado ou destinatário vazio")
+        _registrar_entrega(contexto, "email", destinatario, "ignorado", "Gmail não configurado", inicio)
         return False
     try:
+        import smtplib, ssl
         ctx = ssl.create_default_context()
         with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=ctx) as server:
             server.login(GMAIL_USER, GMAIL_PASS)
@@ -287,15 +709,19 @@ def enviar_email(destinatario, assunto, corpo):
                 f"Content-Type: text/plain; charset=utf-8\n\n"
                 f"{corpo}"
             )
-            server.sendmail(GMAIL_USER, destinatario, msg.encode("utf-8"))
+            recusados = server.sendmail(GMAIL_USER, destinatario, msg.encode("utf-8"))
         print(f"[Gmail] ✅ Email enviado para {destinatario}")
+        _registrar_entrega(contexto, "email", destinatario, "enviado", recusados or "OK", inicio)
         return True
     except Exception as e:
         print(f"[Gmail] ❌ Erro ao enviar para {destinatario}: {e}")
+        _registrar_entrega(contexto, "email", destinatario, "falhou", e, inicio)
         return False
 
-def notificar_alerta(alerta, escola):
-    """Notifica WhatsApp + Email para todos os responsáveis."""
+PERFIS_NOTIFICADOS = ("estadual", "secretaria", "diretor", "coordenador")
+
+def notificar_alerta(alerta, escola, perfis=PERFIS_NOTIFICADOS, titulo="🚨 *ALERTA PROF-SAFE 24*"):
+    """Notifica WhatsApp + Email para os responsáveis (filtrados por perfil)."""
     nome_escola = escola.get("nome", "Escola")
     cidade      = escola.get("cidade", "")
     regiao      = escola.get("regiao", "")
@@ -305,7 +731,7 @@ def notificar_alerta(alerta, escola):
     hora        = alerta.get("time", "")
 
     msg = (
-        f"🚨 *ALERTA PROF-SAFE 24*\n\n"
+        f"{titulo}\n\n"
         f"🏫 Escola: {nome_escola}\n"
         f"📍 {cidade} — Região {regiao}\n"
         f"👤 Professor(a): {professor}\n"
@@ -315,7 +741,7 @@ def notificar_alerta(alerta, escola):
         f"Acesse o painel: https://prof-safe24-premium-secure-pd90.onrender.com/painel_estado"
     )
 
-    assunto = f"🚨 ALERTA PROF-SAFE 24 — {nome_escola} — {desc[:40]}"
+    assunto = f"{titulo.replace('*', '')} — {nome_escola} — {desc[:40]}"
 
     users = load_users()
     for username, info in users.items():
@@ -323,17 +749,254 @@ def notificar_alerta(alerta, escola):
         escola_id_user = info.get("escola_id")
 
         # Notifica: estadual (todos), secretaria (todos), diretor/coord da escola
-        deve_notificar = (
+        deve_notificar = perfil in perfis and (
             perfil in ("estadual", "secretaria") or
             (perfil in ("diretor", "coordenador") and escola_id_user == alerta.get("escola_id"))
         )
         if deve_notificar:
             whats = info.get("whatsapp", "")
             email = info.get("email", "")
+            contexto = {"alerta_id": alerta.get("id"), "escola_id": alerta.get("escola_id"),
+                        "usuario": username, "perfil": perfil}
             if whats:
-                enviar_whatsapp(whats, msg)
+                enviar_whatsapp(whats, msg, contexto)
             if email:
-                enviar_email(email, assunto, msg.replace("*",""))
+                enviar_email(email, assunto, msg.replace("*",""), contexto)
+
+# ============================================================
+# ESCALONAMENTO DE ALERTAS SEM RESPOSTA
+# ============================================================
+# Alerta que continua "Ativo" é renotificado em níveis crescentes:
+#   ESCALONAMENTO="coordenador:3,diretor:5,secretaria:10,estadual:15"
+# (perfil:minutos desde o alerta; "off" desativa). Os prazos ficam numa
+# roda de temporizadores — custo O(1) por tick, sem reler alertas.json.
+# Apenas um worker por host executa o escalonador (flock); os demais
+# o alimentam pelo barramento de eventos.
+ESCALONAMENTO_PADRAO = "coordenador:3,diretor:5,secretaria:10,estadual:15"
+
+def _ler_niveis_escalonamento(texto):
+    niveis = []
+    if texto.strip().lower() in ("", "off", "0", "false"):
+        return niveis
+    for item in texto.split(","):
+        perfil, _, minutos = item.strip().partition(":")
+        try:
+            niveis.append((perfil.strip(), float(minutos)))
+        except ValueError:
+            print(f"[ESCALONAMENTO] ⚠️  Nível inválido ignorado: {item!r}")
+    return sorted(niveis, key=lambda n: n[1])
+
+class TimerWheel:
+    """Roda de temporizadores (hashed timing wheel).
+
+    agendar/cancelar são O(1); avancar() processa só o slot de cada
+    tick. Prazos maiores que uma volta guardam o nº de voltas restantes.
+    relogio pode ser substituído por um relógio simulado.
+    """
+
+    def __init__(self, slots=512, resolucao=1.0, relogio=time.time):
+        self.resolucao = resolucao
+        self.relogio   = relogio
+        self._slots    = [{} for _ in range(slots)]
+        self._posicao  = 0
+        self._ultimo   = relogio()
+        self._timers   = {}   # chave -> índice do slot
+        self._lock     = threading.Lock()
+
+    def __len__(self):
+        return len(self._timers)
+
+    def agendar(self, chave, atraso, fn):
+        with self._lock:
+            self._remover(chave)
+            # Conta a partir do relógio real, não do último tick processado
+            atraso += self.relogio() - self._ultimo
+            ticks  = max(1, math.ceil(atraso / self.resolucao))
+            indice = (self._posicao + ticks) % len(self._slots)
+            self._slots[indice][chave] = [(ticks - 1) // len(self._slots), fn]
+            self._timers[chave] = indice
+
+    def cancelar(self, chave):
+        with self._lock:
+            self._remover(chave)
+
+    def _remover(self, chave):
+        indice = self._timers.pop(chave, None)
+        if indice is not None:
+            self._slots[indice].pop(chave, None)
+
+    def avancar(self):
+        """Processa os ticks vencidos até agora. Retorna quantos dispararam."""
+        vencidos = []
+        with self._lock:
+            agora = self.relogio()
+            while agora - self._ultimo >= self.resolucao:
+                self._ultimo  += self.resolucao
+                self._posicao  = (self._posicao + 1) % len(self._slots)
+                slot = self._slots[self._posicao]
+                for chave, item in list(slot.items()):
+                    if item[0] > 0:
+                        item[0] -= 1
+                    else:
+                        del slot[chave]
+                        del self._timers[chave]
+                        vencidos.append(item[1])
+        for fn in vencidos:
+            try:
+                fn()
+            except Exception as e:
+                print(f"[ESCALONAMENTO] ❌ Erro no temporizador: {e}")
+        return len(vencidos)
+
+def _instante_alerta(alerta):
+    try:
+        return datetime.strptime(alerta.get("time", ""), "%d/%m/%Y %H:%M:%S").timestamp()
+    except ValueError:
+        return None
+
+# Nível já notificado de cada alerta. Fica fora do alertas.json: o
+# escalonador só lê alertas.json e nunca sobrescreve um "Resolvido"
+# gravado por outro worker.
+ESCALONAMENTO_FILE = BASE_DIR / "escalonamento.json"
+
+class Escalonador:
+    """Agenda o próximo nível de cada alerta ativo na TimerWheel.
+
+    O nível já notificado fica gravado em escalonamento.json, então
+    reiniciar o processo não repete notificações.
+    """
+
+    def __init__(self, niveis, roda, notificar=None, arquivo=ESCALONAMENTO_FILE):
+        self.niveis    = niveis
+        self.roda      = roda
+        self.notificar = notificar or self._notificar
+        self.arquivo   = arquivo
+        self._escolas  = {}   # alerta_id -> escola_id (para cancelar por escola)
+        self._vencidos = []
+        self._lock     = threading.Lock()
+
+    def _enviados(self):
+        return _read(self.arquivo, {})
+
+    def agendar(self, alerta, nivel=None):
+        if nivel is None:
+            nivel = int(self._enviados().get(str(alerta.get("id")), 0))
+        inicio = _instante_alerta(alerta)
+        if nivel >= len(self.niveis) or inicio is None or alerta.get("status") != "Ativo":
+            return
+        agora = self.roda.relogio()
+        # Vários níveis vencidos (ex.: após reinício longo): notifica só o mais alto
+        while nivel + 1 < len(self.niveis) and inicio + self.niveis[nivel + 1][1] * 60 <= agora:
+            nivel += 1
+        alerta_id = alerta["id"]
+        atraso = inicio + self.niveis[nivel][1] * 60 - agora
+        with self._lock:
+            self._escolas[alerta_id] = alerta.get("escola_id")
+        self.roda.agendar(alerta_id, max(atraso, 0), lambda: self._vencido(alerta_id, nivel))
+
+    def cancelar_escola(self, escola_id=""):
+        """Cancela os alertas de uma escola (ou de todas, se vazio)."""
+        with self._lock:
+            ids = [a for a, e in self._escolas.items() if not escola_id or e == escola_id]
+            for alerta_id in ids:
+                self._escolas.pop(alerta_id)
+        for alerta_id in ids:
+            self.roda.cancelar(alerta_id)
+
+    def assinar_eventos(self, bus):
+        """Novos alertas agendam; resolver/limpar cancelam (de qualquer worker)."""
+        bus.assinar("alert.created", lambda _e, d: self.agendar(d["alerta"]))
+        for evento in ("alert.resolved", "alerts.cleared"):
+            bus.assinar(evento, lambda _e, d: self.cancelar_escola(d.get("escola_id", "")))
+
+    def reconstruir(self):
+        """Reagenda todos os alertas ativos a partir de alertas.json."""
+        self.cancelar_escola()
+        enviados = self._enviados()
+        for alerta in load_alertas():
+            self.agendar(alerta, int(enviados.get(str(alerta.get("id")), 0)))
+
+    def _vencido(self, alerta_id, nivel):
+        with self._lock:
+            self._escolas.pop(alerta_id, None)
+            self._vencidos.append((alerta_id, nivel))
+
+    def avancar(self):
+        """Avança a roda e notifica os níveis vencidos (uma leitura/gravação por tick)."""
+        self.roda.avancar()
+        with self._lock:
+            vencidos, self._vencidos = self._vencidos, []
+        if not vencidos:
+            return 0
+        por_id   = {a.get("id"): a for a in load_alertas()}
+        enviados = self._enviados()
+        disparar = []
+        for alerta_id, nivel in vencidos:
+            alerta = por_id.get(alerta_id)
+            if not alerta or alerta.get("status") != "Ativo":
+                continue
+            if int(enviados.get(str(alerta_id), 0)) > nivel:
+                continue  # já notificado por outro processo
+            enviados[str(alerta_id)] = nivel + 1
+            disparar.append((alerta, nivel))
+        if disparar:
+            # Descarta alertas que já saíram do alertas.json (limpos ou além dos 500)
+            _write(self.arquivo, {k: v for k, v in enviados.items()
+                                  if k.isdigit() and int(k) in por_id})
+        for alerta, nivel in disparar:
+            perfil, minutos = self.niveis[nivel]
+            print(f"[ESCALONAMENTO] Alerta #{alerta['id']} sem resposta há {minutos:g} min → {perfil}")
+            try:
+                self.notificar(alerta, perfil, minutos)
+            except Exception as e:
+                print(f"[ESCALONAMENTO] ❌ Erro ao notificar alerta #{alerta['id']}: {e}")
+            self.agendar(alerta, nivel + 1)
+        return len(disparar)
+
+    def _notificar(self, alerta, perfil, minutos):
+        escola = load_escolas().get(alerta.get("escola_id"), {})
+        notificar_alerta(alerta, escola, perfis=(perfil,),
+                         titulo=f"⏫ *ALERTA SEM RESPOSTA HÁ {minutos:g} MIN*")
+
+escalonador = Escalonador(
+    _ler_niveis_escalonamento(os.environ.get("ESCALONAMENTO", ESCALONAMENTO_PADRAO)),
+    TimerWheel(),
+)
+_escalonador_pid  = None
+_escalonador_lock = None
+
+def _iniciar_escalonador():
+    """Tenta assumir o escalonador neste worker (um por host, via flock)."""
+    global _escalonador_pid
+    if _escalonador_pid == os.getpid() or not escalonador.niveis:
+        return
+    _escalonador_pid = os.getpid()
+    threading.Thread(target=_loop_escalonador, daemon=True, name="escalonador").start()
+
+def _assumir_lideranca():
+    global _escalonador_lock
+    arq = open(_caminho_temp("escalonador.lock"), "w")
+    if not _flock(arq, esperar=False):
+        arq.close()
+        return False
+    _escalonador_lock = arq  # mantém o arquivo aberto enquanto o processo viver
+    return True
+
+def _loop_escalonador():
+    # Worker que não é líder tenta de novo periodicamente: se o líder
+    # for reciclado, outro worker assume e reconstrói a partir do disco.
+    while not _assumir_lideranca():
+        time.sleep(30)
+    escalonador.assinar_eventos(event_bus)
+    escalonador.reconstruir()
+    print(f"[ESCALONAMENTO] ✅ Ativo no pid {os.getpid()} — {len(escalonador.roda)} alerta(s) pendente(s)")
+    while True:
+        time.sleep(escalonador.roda.resolucao)
+        escalonador.avancar()
+
+@app.before_request
+def _iniciar_escalonador_no_worker():
+    _iniciar_escalonador()
 
 def api_login_required(f):
     @wraps(f)
@@ -343,6 +1006,125 @@ def api_login_required(f):
         return f(*args, **kwargs)
     return decorated
 
+# ============================================================
+# COMPRESSÃO HTTP (gzip / brotli)
+# ============================================================
+# /api/status é consultado a cada 1,5~2s por todos os painéis e
+# repete nomes de escola e descrições — comprime muito bem.
+# O resultado comprimido fica em cache (LRU) enquanto o conteúdo
+# não muda, então N painéis pagam a compressão uma única vez.
+COMPRESS_MIN_SIZE  = 500    # bytes — abaixo disso não compensa
+COMPRESS_MIMETYPES = ("application/json", "text/html")
+COMPRESS_CACHE_MAX = 64
+
+_compress_cache = OrderedDict()
+_compress_lock  = threading.Lock()
+
+def _escolher_encoding():
+    """Negocia a codificação com o Accept-Encoding do cliente (respeita q=)."""
+    oferecidos = ["br", "gzip"] if brotli else ["gzip"]
+    return request.accept_encodings.best_match(oferecidos)
+
+def _comprimir(dados, encoding):
+    chave = (encoding, hashlib.sha1(dados).digest())
+    with _compress_lock:
+        if chave in _compress_cache:
+            _compress_cache.move_to_end(chave)
+            return _compress_cache[chave]
+    if encoding == "br":
+        comprimido = brotli.compress(dados, quality=5)
+    else:
+        comprimido = gzip.compress(dados, compresslevel=6, mtime=0)
+    with _compress_lock:
+        _compress_cache[chave] = comprimido
+        while len(_compress_cache) > COMPRESS_CACHE_MAX:
+            _compress_cache.popitem(last=False)
+    return comprimido
+
+@app.after_request
+def comprimir_resposta(resp):
+    if (resp.direct_passthrough or resp.status_code != 200
+            or resp.mimetype not in COMPRESS_MIMETYPES
+            or "Content-Encoding" in resp.headers):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    encoding = _escolher_encoding()
+    if not encoding:
+        return resp
+    dados = resp.get_data()
+    if len(dados) < COMPRESS_MIN_SIZE:
+        return resp
+    resp.set_data(_comprimir(dados, encoding))
+    resp.headers["Content-Encoding"] = encoding
+    etag, fraco = resp.get_etag()
+    if etag:
+        # Representação diferente → ETag diferente (ver _etag_da_resposta)
+        resp.set_etag(f"{etag}-{encoding}", weak=fraco)
+    return resp
+
+# ============================================================
+# CACHE DE PÁGINAS RENDERIZADAS (ETag)
+# ============================================================
+# O HTML destas páginas só muda com os argumentos da URL, com
+# escolas.json e com as variáveis de inject_estado (fixas no processo).
+# Guardamos o HTML pronto por (template, argumentos, geração de
+# escolas.json) e respondemos 304 quando o navegador/edge já tem a
+# mesma versão — /professor abre instantâneo numa emergência.
+PAGINAS_CACHE_MAX = 256
+CACHE_PUBLICO     = "public, max-age=60"   # páginas sem login
+CACHE_PRIVADO     = "private, no-cache"    # painéis: sempre revalida
+
+_paginas_cache = OrderedDict()
+_paginas_lock  = threading.Lock()
+
+def _geracao_escolas():
+    try:
+        st = ESCOLAS_FILE.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _etag_da_resposta(etag, corpo):
+    """ETag da representação que esta requisição receberia.
+
+    comprimir_resposta() acrescenta -gzip/-br ao ETag; só vale o sufixo
+    da codificação que seria escolhida agora para este cliente.
+    """
+    encoding = _escolher_encoding()
+    if encoding and len(corpo) >= COMPRESS_MIN_SIZE:
+        return f"{etag}-{encoding}"
+    return etag
+
+def render_em_cache(template, argumentos, contexto, cache_control=CACHE_PRIVADO):
+    """render_template com cache do HTML e validação por ETag forte.
+
+    contexto é uma função que monta as variáveis do template; só é
+    chamada quando a página não está em cache.
+    """
+    chave = (template, argumentos, _geracao_escolas())
+    with _paginas_lock:
+        item = _paginas_cache.get(chave)
+        if item:
+            _paginas_cache.move_to_end(chave)
+    if not item:
+        corpo = render_template(template, **contexto()).encode("utf-8")
+        item  = (corpo, hashlib.sha1(corpo).hexdigest()[:24])
+        with _paginas_lock:
+            _paginas_cache[chave] = item
+            while len(_paginas_cache) > PAGINAS_CACHE_MAX:
+                _paginas_cache.popitem(last=False)
+    corpo, etag = item
+    etag_variante = _etag_da_resposta(etag, corpo)
+    if request.if_none_match.contains(etag_variante):
+        resp = app.response_class(status=304)
+        resp.set_etag(etag_variante)
+        resp.vary.add("Accept-Encoding")  # comprimir_resposta() não passa pelos 304
+    else:
+        resp = app.response_class(corpo, mimetype="text/html")
+        resp.set_etag(etag)
+    resp.headers["Cache-Control"] = cache_control
+    return resp
+
 # ============================================================
 # PÁGINAS PÚBLICAS
 # ============================================================
@@ -358,7 +1140,8 @@ def home():
             return redirect("/painel_secretaria")
         elif perfil in ("diretor", "coordenador"):
             return redirect("/central")
-    return render_template("home.html")
+    # no-cache: quem fizer login precisa ser redirecionado na próxima visita
+    return render_em_cache("home.html", (), dict, "no-cache")
 
 @app.route("/acesso_negado")
 def acesso_negado():
@@ -367,18 +1150,22 @@ def acesso_negado():
 @app.route("/professor")
 def professor():
     escola_id = request.args.get("escola", "escola_001")
-    escolas   = load_escolas()
-    escola    = escolas.get(escola_id, {})
-    return render_template("professor.html", escola=escola, escola_id=escola_id,
-                           escolas=list(escolas.values()))
+
+    def contexto():
+        escolas = load_escolas()
+        return dict(escola=escolas.get(escola_id, {}), escola_id=escola_id,
+                    escolas=list(escolas.values()))
+    return render_em_cache("professor.html", (escola_id,), contexto, CACHE_PUBLICO)
 
 @app.route("/painel_publico")
 def painel_publico():
     escola_id = request.args.get("escola", "")
-    escolas   = load_escolas()
-    escola    = escolas.get(escola_id, {}) if escola_id else {}
-    return render_template("painel_publico.html", escola=escola, escola_id=escola_id,
-                           escolas=list(escolas.values()))
+
+    def contexto():
+        escolas = load_escolas()
+        return dict(escola=escolas.get(escola_id, {}) if escola_id else {},
+                    escola_id=escola_id, escolas=list(escolas.values()))
+    return render_em_cache("painel_publico.html", (escola_id,), contexto, CACHE_PUBLICO)
 
 # ============================================================
 # LOGIN / LOGOUT
@@ -432,9 +1219,8 @@ def logout():
 @role_required("admin", "diretor", "coordenador")
 def central():
     escola_id = session.get("escola_id") or request.args.get("escola", "")
-    escolas   = load_escolas()
-    escola    = escolas.get(escola_id, {})
-    return render_template("central.html", escola=escola, escola_id=escola_id)
+    return render_em_cache("central.html", (escola_id,),
+                           lambda: dict(escola=load_escolas().get(escola_id, {}), escola_id=escola_id))
 
 # ============================================================
 # PAINEL ESTADUAL (Responsável Segurança Estadual)
@@ -445,8 +1231,8 @@ def painel_estado():
         return redirect("/login?next=painel_estado")
     if session.get("perfil") not in ("admin", "estadual"):
         return redirect("/acesso_negado")
-    escolas = load_escolas()
-    return render_template("painel_estado.html", escolas=list(escolas.values()))
+    return render_em_cache("painel_estado.html", (),
+                           lambda: dict(escolas=list(load_escolas().values())))
 
 # ============================================================
 # PAINEL SECRETARIA
@@ -454,8 +1240,8 @@ def painel_estado():
 @app.route("/painel_secretaria")
 @role_required("admin", "secretaria")
 def painel_secretaria():
-    escolas = load_escolas()
-    return render_template("painel_secretaria.html", escolas=list(escolas.values()))
+    return render_em_cache("painel_secretaria.html", (),
+                           lambda: dict(escolas=list(load_escolas().values())))
 
 # ============================================================
 # ADMIN
@@ -494,6 +1280,7 @@ def admin_add_escola():
         "ativo":    True
     }
     save_escolas(escolas)
+    event_bus.publicar("escolas.changed", {"escola_id": escola_id})
     return redirect("/admin?msg=Escola+cadastrada")
 
 @app.route("/admin/usuario/add", methods=["POST"])
@@ -529,6 +1316,7 @@ def admin_delete_escola(escola_id):
     if escola_id in escolas:
         escolas.pop(escola_id)
         save_escolas(escolas)
+        event_bus.publicar("escolas.changed", {"escola_id": escola_id})
     return redirect("/admin?msg=Escola+removida")
 
 # ============================================================
@@ -565,6 +1353,7 @@ def api_alert():
     st["last_alert_time"] = alerta["time"]
     save_alertas(alertas)
     save_state(st)
+    event_bus.publicar("alert.created", {"alerta": alerta})
 
     # Notifica WhatsApp e Email — síncrono com log completo
     try:
@@ -581,14 +1370,95 @@ def api_alert():
 # ============================================================
 # API — STATUS (filtrável por escola)
 # ============================================================
+class MicroCache:
+    """Cache de TTL curto com coalescência (single-flight).
+
+    Vários misses simultâneos da mesma chave calculam o valor uma
+    única vez; os demais esperam e reaproveitam o resultado.
+    invalidar() descarta tudo, inclusive cálculos em andamento.
+    """
+    MAX_CHAVES = 1024
+
+    def __init__(self, ttl):
+        self.ttl      = ttl
+        self._dados   = {}   # chave -> (expira_em, geracao, valor)
+        self._travas  = {}
+        self._lock    = threading.Lock()
+        self._geracao = 0
+
+    def _valido(self, item):
+        return item and item[0] > time.monotonic() and item[1] == self._geracao
+
+    def obter(self, chave, calcular):
+        item = self._dados.get(chave)
+        if self._valido(item):
+            return item[2]
+        with self._lock:
+            trava = self._travas.setdefault(chave, threading.Lock())
+        with trava:
+            item = self._dados.get(chave)
+            if self._valido(item):
+                return item[2]
+            geracao = self._geracao
+            try:
+                valor = calcular()
+                with self._lock:
+                    if len(self._dados) >= self.MAX_CHAVES:
+                        self._dados.clear()
+                    self._dados[chave] = (time.monotonic() + self.ttl, geracao, valor)
+            finally:
+                # A trava só existe durante o cálculo: quem já a pegou encontra
+                # o valor pronto; chaves arbitrárias (?escola=...) não acumulam
+                with self._lock:
+                    if self._travas.get(chave) is trava:
+                        del self._travas[chave]
+            return valor
+
+    def invalidar(self, *_):
+        with self._lock:
+            self._geracao += 1
+            self._dados.clear()
+            self._travas.clear()
+
+    def assinar_eventos(self, bus, eventos):
+        """Invalida o cache quando qualquer worker publicar um dos eventos."""
+        for evento in eventos:
+            bus.assinar(evento, self.invalidar)
+
+# Resposta anônima de /api/status (home e painel público em cada corredor):
+# centenas de telas custam uma leitura dos arquivos por segundo.
+STATUS_PUBLICO_TTL = 1.0
+EVENTOS_STATUS_PUBLICO = ("alert.created", "alert.resolved", "alerts.cleared",
+                          "siren.changed", "escolas.changed")
+_status_publico_cache = MicroCache(STATUS_PUBLICO_TTL)
+_status_publico_cache.assinar_eventos(event_bus, EVENTOS_STATUS_PUBLICO)
+
+def _status_publico(escola_id):
+    st      = load_state()
+    alertas = load_alertas()
+    if escola_id:
+        siren = any(a.get("status") == "Ativo" for a in alertas if a.get("escola_id") == escola_id)
+    else:
+        siren = st.get("siren_on", False)
+    return app.json.dumps({
+        "alertas":         [],
+        "siren_on":        siren,
+        "last_alert_time": None,
+        "total_escolas":   len(load_escolas()),
+        "total_ativos":    sum(1 for a in alertas if a.get("status") == "Ativo")
+    })
+
 @app.route("/api/status")
 def api_status():
-    st        = load_state()
-    alertas   = load_alertas()
     escola_id = request.args.get("escola", "")
-    logado    = session.get("logged_in", False)
-    perfil    = session.get("perfil", "")
 
+    # Usuários NÃO logados vêem apenas totais — sem detalhes de ocorrências
+    if not session.get("logged_in", False):
+        corpo = _status_publico_cache.obter(escola_id, lambda: _status_publico(escola_id))
+        return app.response_class(corpo, mimetype="application/json")
+
+    st      = load_state()
+    alertas = load_alertas()
     if escola_id:
         alertas_filtrados = [a for a in alertas if a.get("escola_id") == escola_id]
         siren = any(a.get("status") == "Ativo" for a in alertas_filtrados)
@@ -596,16 +1466,6 @@ def api_status():
         alertas_filtrados = alertas
         siren = st.get("siren_on", False)
 
-    # Usuários NÃO logados vêem apenas totais — sem detalhes de ocorrências
-    if not logado:
-        return jsonify({
-            "alertas":         [],
-            "siren_on":        siren,
-            "last_alert_time": None,
-            "total_escolas":   len(load_escolas()),
-            "total_ativos":    sum(1 for a in alertas if a.get("status") == "Ativo")
-        })
-
     # Usuários logados vêem dados completos conforme perfil
     return jsonify({
         "alertas":         alertas_filtrados,
@@ -626,6 +1486,7 @@ def api_siren():
     if action == "on":   st["siren_on"] = True
     elif action == "off": st["siren_on"] = False
     save_state(st)
+    event_bus.publicar("siren.changed", {"siren_on": st["siren_on"]})
     return jsonify({"ok": True, "siren_on": st["siren_on"]})
 
 # ============================================================
@@ -643,6 +1504,7 @@ def api_resolve():
     st["siren_on"] = False
     save_alertas(alertas)
     save_state(st)
+    event_bus.publicar("alert.resolved", {"escola_id": escola_id})
     return jsonify({"ok": True})
 
 @app.route("/api/clear", methods=["POST"])
@@ -657,8 +1519,36 @@ def api_clear():
     st["siren_on"] = False
     save_alertas(alertas)
     save_state(st)
+    event_bus.publicar("alerts.cleared", {"escola_id": escola_id})
     return jsonify({"ok": True})
 
+# ============================================================
+# API — ENTREGAS DE NOTIFICAÇÃO
+# ============================================================
+# Contêm WhatsApp/email de todos os perfis: diretor/coordenador só
+# consultam alertas da própria escola; busca por destinatário é restrita.
+@app.route("/api/alert/<int:alerta_id>/deliveries")
+@api_login_required
+def api_alert_deliveries(alerta_id):
+    entregas = ledger_entregas.por_alerta(alerta_id)
+    if session.get("perfil") in ("diretor", "coordenador"):
+        # A escola vem gravada em cada registro — vale mesmo após o alerta
+        # sair de alertas.json (limpeza do histórico)
+        escola_id = session.get("escola_id")
+        if not entregas or any(e.get("escola_id") != escola_id for e in entregas):
+            return jsonify({"ok": False, "error": "Alerta de outra escola."}), 403
+    return jsonify(entregas)
+
+@app.route("/api/deliveries")
+@api_login_required
+def api_deliveries():
+    if session.get("perfil") not in ("admin", "estadual"):
+        return jsonify({"ok": False, "error": "Acesso negado."}), 403
+    destinatario = request.args.get("destinatario", "")
+    if not destinatario:
+        return jsonify({"ok": False, "error": "Informe o destinatário."}), 400
+    return jsonify(ledger_entregas.por_destinatario(destinatario))
+
 # ============================================================
 # API — LISTA DE ESCOLAS
 # ============================================================
@@ -672,6 +1562,8 @@ def api_escolas():
 # ============================================================
 @app.route("/report.pdf")
 def gerar_relatorio():
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas as pdf_canvas
     alertas   = load_alertas()
     escola_id = request.args.get("escola", "")
     if escola_id:
@@ -718,7 +1610,7 @@ def gerar_relatorio():
 # ============================================================
 @app.route("/bem-estar")
 def bem_estar():
-    return render_template("bem_estar_prof.html")
+    return render_em_cache("bem_estar_prof.html", (), dict, CACHE_PUBLICO)
 
 @app.route("/api/bem-estar", methods=["POST"])
 def api_bem_estar():
@@ -749,6 +1641,7 @@ def api_bem_estar():
     )
 
     import json as _json
+    import urllib.request
     payload = _json.dumps({
         "model":      "claude-haiku-4-5-20251001",
         "max_tokens": 500,
@@ -788,6 +1681,7 @@ def tocar_sirene():
 # RUN
 # ============================================================
 if __name__ == "__main__":
+    create_app()
     print("=" * 62)
     print(f"🚨  {SISTEMA_TITULO} — Sistema Estadual de Segurança Escolar")
     print(f"    Estado de {ESTADO_NOME} / {ESTADO_SIGLA}")
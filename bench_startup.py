@@ -0,0 +1,55 @@
+"""
+PROF-SAFE 24 — Benchmark de inicialização
+
+Mede, em processos Python novos (como um worker do gunicorn):
+  • import do app.py
+  • create_app() (fase única de inicialização)
+  • se o reportlab foi carregado antes do primeiro /report.pdf
+
+Roda sobre uma cópia temporária do projeto para não alterar os JSON.
+
+Uso:  python bench_startup.py [N_EXECUCOES] [PASTA_DO_PROJETO]
+"""
+import json, os, shutil, statistics, subprocess, sys, tempfile
+from pathlib import Path
+
+MEDIR = r"""
+import json, sys, time, io, contextlib
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+    t1 = time.perf_counter()
+    if hasattr(app, "create_app"):
+        app.create_app()
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "init": t2 - t1,
+                  "reportlab": "reportlab" in sys.modules}))
+"""
+
+def medir(pasta, n):
+    amostras = []
+    for _ in range(n):
+        out = subprocess.run([sys.executable, "-c", MEDIR], cwd=pasta,
+                             capture_output=True, text=True, check=True).stdout
+        amostras.append(json.loads(out.strip().splitlines()[-1]))
+    return amostras
+
+def main():
+    n     = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    fonte = Path(sys.argv[2] if len(sys.argv) > 2 else Path(__file__).parent).resolve()
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(fonte, tmp, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns(".git", "__pycache__"))
+        medir(tmp, 1)  # aquece o cache de bytecode / disco
+        amostras = medir(tmp, n)
+    imp  = [a["import"] * 1000 for a in amostras]
+    ini  = [a["init"]   * 1000 for a in amostras]
+    tot  = [i + j for i, j in zip(imp, ini)]
+    print(f"Execuções:          {n}")
+    print(f"import app:         {statistics.median(imp):7.1f} ms (mediana)")
+    print(f"create_app():       {statistics.median(ini):7.1f} ms (mediana)")
+    print(f"total:              {statistics.median(tot):7.1f} ms (mediana)")
+    print(f"reportlab no boot:  {'sim' if amostras[0]['reportlab'] else 'não'}")
+
+if __name__ == "__main__":
+    main()
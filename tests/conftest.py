@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# app.py fica na raiz do projeto (sem pacote instalável)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    """Test client com dados, ledger e barramento isolados em tmp_path."""
+    for nome in ("USERS_FILE", "ESCOLAS_FILE", "ALERTS_FILE", "STATE_FILE"):
+        monkeypatch.setattr(app, nome, tmp_path / f"{nome.lower()}.json")
+    monkeypatch.setattr(app, "_inicializado", True)
+    monkeypatch.setattr(app.escalonador, "niveis", [])
+    monkeypatch.setattr(app, "event_bus", app.EventBusLocal())
+    app._status_publico_cache.invalidar()
+    app._status_publico_cache.assinar_eventos(app.event_bus, app.EVENTOS_STATUS_PUBLICO)
+    monkeypatch.setattr(app, "ledger_entregas", app.LedgerEntregas(tmp_path / "entregas.jsonl"))
+    return app.app.test_client()
@@ -0,0 +1,97 @@
+"""
+Compressão HTTP (negociação, limite de tamanho, Vary) e paridade do JSON com orjson.
+"""
+import gzip
+import json
+from collections import OrderedDict
+
+import pytest
+
+import app
+
+
+class BrotliFalso:
+    @staticmethod
+    def compress(dados, quality=None):
+        return b"BR:" + dados
+
+
+@pytest.fixture
+def cliente(cliente, monkeypatch):
+    monkeypatch.setattr(app, "_compress_cache", OrderedDict())
+    app.save_escolas({"escola_001": {"id": "escola_001", "nome": "Escola Teste"}})
+    return cliente
+
+
+@pytest.fixture
+def com_brotli(monkeypatch):
+    monkeypatch.setattr(app, "brotli", BrotliFalso)
+
+
+def _encoding(cliente, accept):
+    r = cliente.get("/professor", headers={"Accept-Encoding": accept})
+    return r.headers.get("Content-Encoding")
+
+
+def test_gzip_negociado(cliente):
+    r = cliente.get("/professor", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert b"Escola Teste" in gzip.decompress(r.data)
+
+
+def test_sem_accept_encoding_nao_comprime(cliente):
+    assert _encoding(cliente, "identity") is None
+
+
+@pytest.mark.parametrize("accept,esperado", [
+    ("br, gzip", "br"),
+    ("gzip, br", "br"),                 # empate: preferência do servidor
+    ("br;q=0.5, gzip;q=1.0", "gzip"),   # cliente prefere gzip
+    ("br;q=0, gzip", "gzip"),
+    ("br", "br"),
+])
+def test_respeita_q_values(cliente, com_brotli, accept, esperado):
+    assert _encoding(cliente, accept) == esperado
+
+
+def test_br_sem_modulo_brotli_cai_para_gzip(cliente, monkeypatch):
+    monkeypatch.setattr(app, "brotli", None)
+    assert _encoding(cliente, "br;q=1.0, gzip;q=0.5") == "gzip"
+    assert _encoding(cliente, "br") is None
+
+
+def test_respostas_pequenas_nao_sao_comprimidas(cliente):
+    r = cliente.get("/api/status", headers={"Accept-Encoding": "gzip"})
+    assert len(r.data) < app.COMPRESS_MIN_SIZE
+    assert "Content-Encoding" not in r.headers
+    assert "Accept-Encoding" in r.vary
+
+
+@pytest.mark.parametrize("accept", ["gzip", "identity"])
+def test_vary_em_html_e_json(cliente, accept):
+    for url in ("/professor", "/api/status"):
+        r = cliente.get(url, headers={"Accept-Encoding": accept})
+        assert "Accept-Encoding" in r.vary
+
+
+def test_variante_comprimida_reaproveitada(cliente):
+    cliente.get("/professor", headers={"Accept-Encoding": "gzip"})
+    cliente.get("/professor", headers={"Accept-Encoding": "gzip"})
+    assert len(app._compress_cache) == 1
+
+
+DADOS = {2: "é", 1: {"b": [1, 2], "a": None}, 10: True}
+
+
+def test_json_das_respostas_igual_ao_padrao():
+    # Com ou sem orjson, jsonify() produz o mesmo texto que o json padrão
+    esperado = json.dumps(DADOS, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    with app.app.test_request_context():
+        assert app.jsonify(DADOS).get_data(as_text=True).strip() == esperado
+        assert app.jsonify({"b": 1, "a": "é"}).get_data(as_text=True).strip() == '{"a":"é","b":1}'
+
+
+def test_arquivo_com_chaves_nao_str(tmp_path):
+    caminho = tmp_path / "dados.json"
+    app._write(caminho, DADOS)
+    assert app._read(caminho, None) == json.loads(json.dumps(DADOS))
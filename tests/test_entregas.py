@@ -0,0 +1,90 @@
+"""
+Ledger de entregas: permissões de /api/alert/<id>/deliveries e /api/deliveries.
+"""
+import pytest
+
+import app
+
+USUARIOS = {
+    "admin":      {"senha": "a", "perfil": "admin",       "escola_id": None},
+    "estadual":   {"senha": "e", "perfil": "estadual",    "escola_id": None},
+    "secretaria": {"senha": "s", "perfil": "secretaria",  "escola_id": None},
+    "coord001":   {"senha": "c", "perfil": "coordenador", "escola_id": "escola_001"},
+    "diretor002": {"senha": "d", "perfil": "diretor",     "escola_id": "escola_002"},
+}
+
+
+@pytest.fixture
+def cliente(cliente):
+    app.save_users(USUARIOS)
+    app.save_alertas([{"id": 1, "escola_id": "escola_001", "status": "Ativo"},
+                      {"id": 2, "escola_id": "escola_002", "status": "Ativo"}])
+    for alerta_id, escola_id in ((1, "escola_001"), (2, "escola_002")):
+        app._registrar_entrega({"alerta_id": alerta_id, "escola_id": escola_id,
+                                "usuario": "estadual", "perfil": "estadual"},
+                               "whatsapp", "5562999990000", "enviado", "ok", 0)
+    return cliente
+
+
+def _login(cliente, usuario):
+    cliente.post("/login", data={"usuario": usuario, "senha": USUARIOS[usuario]["senha"]})
+
+
+def test_exige_login(cliente):
+    assert cliente.get("/api/alert/1/deliveries").status_code == 401
+
+
+@pytest.mark.parametrize("usuario", ["admin", "estadual", "secretaria"])
+def test_perfis_globais_veem_qualquer_alerta(cliente, usuario):
+    _login(cliente, usuario)
+    for alerta_id in (1, 2):
+        r = cliente.get(f"/api/alert/{alerta_id}/deliveries")
+        assert r.status_code == 200
+        assert [e["alerta_id"] for e in r.get_json()] == [alerta_id]
+
+
+@pytest.mark.parametrize("usuario,proprio,outro", [("coord001", 1, 2), ("diretor002", 2, 1)])
+def test_gestor_ve_so_a_propria_escola(cliente, usuario, proprio, outro):
+    _login(cliente, usuario)
+    assert cliente.get(f"/api/alert/{proprio}/deliveries").status_code == 200
+    assert cliente.get(f"/api/alert/{outro}/deliveries").status_code == 403
+    assert cliente.get("/api/alert/99/deliveries").status_code == 403
+
+
+def test_gestor_autorizado_pelo_registro_e_nao_pelo_alerta(cliente):
+    app.save_alertas([])  # histórico limpo: a escola vem do próprio ledger
+    _login(cliente, "coord001")
+    assert cliente.get("/api/alert/1/deliveries").status_code == 200
+    assert cliente.get("/api/alert/2/deliveries").status_code == 403
+
+    # Registro sem escola (anterior ao campo) não é exposto a gestores
+    app._registrar_entrega({"alerta_id": 3, "usuario": "estadual", "perfil": "estadual"},
+                           "email", "x@y.z", "enviado", "OK", 0)
+    assert cliente.get("/api/alert/3/deliveries").status_code == 403
+
+
+@pytest.mark.parametrize("usuario,status", [
+    ("admin", 200), ("estadual", 200), ("secretaria", 403), ("coord001", 403), ("diretor002", 403),
+])
+def test_busca_por_destinatario_restrita(cliente, usuario, status):
+    _login(cliente, usuario)
+    r = cliente.get("/api/deliveries?destinatario=5562999990000")
+    assert r.status_code == status
+    if status == 200:
+        assert len(r.get_json()) == 2
+
+
+def test_rotacao_mantem_indices_consistentes(tmp_path):
+    ledger = app.LedgerEntregas(tmp_path / "entregas.jsonl", max_bytes=400)
+    for i in range(3):
+        ledger.registrar({"alerta_id": i, "destinatario": "d", "resposta": "x" * 80})
+    assert [r["alerta_id"] for r in ledger.por_destinatario("d")] == [0, 1, 2]
+
+    ledger.registrar({"alerta_id": 3, "destinatario": "d", "resposta": "x" * 80})
+    assert (tmp_path / "entregas.jsonl.1").exists()
+    assert not (tmp_path / "entregas.jsonl").exists()
+    assert ledger.por_destinatario("d") == []
+
+    ledger.registrar({"alerta_id": 4, "destinatario": "d"})
+    assert [r["alerta_id"] for r in ledger.por_destinatario("d")] == [4]
+    assert ledger.por_alerta(0) == []
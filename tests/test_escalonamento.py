@@ -0,0 +1,164 @@
+"""
+Escalonamento de alertas com relógio simulado (TimerWheel / Escalonador).
+"""
+from datetime import datetime
+
+import pytest
+
+import app
+
+INICIO = datetime(2026, 10, 19, 10, 0, 0)
+NIVEIS = [("coordenador", 3), ("diretor", 5), ("secretaria", 10)]
+
+
+class Relogio:
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def relogio():
+    return Relogio(INICIO.timestamp())
+
+
+@pytest.fixture(autouse=True)
+def arquivos(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "ALERTS_FILE", tmp_path / "alertas.json")
+    monkeypatch.setattr(app, "ESCOLAS_FILE", tmp_path / "escolas.json")
+    return tmp_path
+
+
+def _alerta(alerta_id, escola_id="escola_001", status="Ativo"):
+    return {"id": alerta_id, "escola_id": escola_id, "status": status,
+            "time": INICIO.strftime("%d/%m/%Y %H:%M:%S")}
+
+
+def _escalonador(relogio, arquivos, enviados, niveis=NIVEIS, slots=512):
+    return app.Escalonador(
+        niveis, app.TimerWheel(slots=slots, relogio=relogio),
+        notificar=lambda alerta, perfil, minutos: enviados.append((alerta["id"], perfil, relogio.t)),
+        arquivo=arquivos / "escalonamento.json",
+    )
+
+
+def _avancar(esc, relogio, segundos):
+    for _ in range(segundos):
+        relogio.t += 1
+        esc.avancar()
+
+
+def test_niveis_disparam_no_prazo(relogio, arquivos):
+    app.save_alertas([_alerta(1)])
+    enviados = []
+    esc = _escalonador(relogio, arquivos, enviados)
+    esc.reconstruir()
+
+    _avancar(esc, relogio, 179)
+    assert enviados == []
+    _avancar(esc, relogio, 1)
+    assert enviados == [(1, "coordenador", INICIO.timestamp() + 180)]
+    _avancar(esc, relogio, 119)
+    assert len(enviados) == 1
+    _avancar(esc, relogio, 1)
+    assert enviados[-1] == (1, "diretor", INICIO.timestamp() + 300)
+
+
+def test_prazo_maior_que_uma_volta_da_roda(relogio):
+    roda = app.TimerWheel(slots=8, relogio=relogio)
+    disparos = []
+    roda.agendar("a", 20, lambda: disparos.append(relogio.t))
+    roda.agendar("b", 3, lambda: disparos.append(relogio.t))
+    for _ in range(30):
+        relogio.t += 1
+        roda.avancar()
+    inicio = INICIO.timestamp()
+    assert disparos == [inicio + 3, inicio + 20]
+    assert len(roda) == 0
+
+
+def test_escalonamento_com_varias_voltas(relogio, arquivos):
+    # 3 min = 180 ticks numa roda de 16 slots
+    app.save_alertas([_alerta(1)])
+    enviados = []
+    esc = _escalonador(relogio, arquivos, enviados, slots=16)
+    esc.reconstruir()
+    _avancar(esc, relogio, 179)
+    assert enviados == []
+    _avancar(esc, relogio, 1)
+    assert [p for _, p, _ in enviados] == ["coordenador"]
+
+
+@pytest.mark.parametrize("evento", ["alert.resolved", "alerts.cleared"])
+def test_cancelamento_por_evento(relogio, arquivos, evento):
+    app.save_alertas([_alerta(1, "escola_001"), _alerta(2, "escola_002")])
+    enviados = []
+    esc = _escalonador(relogio, arquivos, enviados)
+    bus = app.EventBusLocal()
+    esc.assinar_eventos(bus)
+    esc.reconstruir()
+
+    bus.publicar(evento, {"escola_id": "escola_001"})
+    _avancar(esc, relogio, 180)
+    assert [a for a, _, _ in enviados] == [2]
+
+    bus.publicar(evento, {"escola_id": ""})
+    assert len(esc.roda) == 0
+    _avancar(esc, relogio, 15 * 60)
+    assert [a for a, _, _ in enviados] == [2]
+
+
+def test_novo_alerta_por_evento(relogio, arquivos):
+    app.save_alertas([])
+    enviados = []
+    esc = _escalonador(relogio, arquivos, enviados)
+    bus = app.EventBusLocal()
+    esc.assinar_eventos(bus)
+    esc.reconstruir()
+
+    alerta = _alerta(7)
+    app.save_alertas([alerta])
+    bus.publicar("alert.created", {"alerta": alerta})
+    _avancar(esc, relogio, 180)
+    assert enviados == [(7, "coordenador", INICIO.timestamp() + 180)]
+
+
+def test_resolucao_gravada_por_outro_worker_nao_e_sobrescrita(relogio, arquivos):
+    app.save_alertas([_alerta(1)])
+    esc = _escalonador(relogio, arquivos, [])
+    esc.reconstruir()
+    _avancar(esc, relogio, 179)
+    app.save_alertas([_alerta(1, status="Resolvido")])
+    _avancar(esc, relogio, 400)
+    assert app.load_alertas()[0]["status"] == "Resolvido"
+
+
+def test_reconstruir_reagenda_so_niveis_pendentes(relogio, arquivos):
+    app.save_alertas([_alerta(1), _alerta(2)])
+    enviados = []
+    esc = _escalonador(relogio, arquivos, enviados)
+    esc.reconstruir()
+    _avancar(esc, relogio, 180)
+    assert sorted(a for a, _, _ in enviados) == [1, 2]
+
+    # Reinício: alerta 2 foi resolvido enquanto o processo estava parado
+    app.save_alertas([_alerta(1), _alerta(2, status="Resolvido")])
+    depois = []
+    novo = _escalonador(relogio, arquivos, depois)
+    novo.reconstruir()
+    assert len(novo.roda) == 1
+
+    _avancar(novo, relogio, 10 * 60)
+    assert [(a, p) for a, p, _ in depois] == [(1, "diretor"), (1, "secretaria")]
+
+
+def test_reinicio_longo_notifica_so_o_nivel_mais_alto(relogio, arquivos):
+    app.save_alertas([_alerta(1)])
+    relogio.t += 11 * 60
+    enviados = []
+    esc = _escalonador(relogio, arquivos, enviados)
+    esc.reconstruir()
+    _avancar(esc, relogio, 2)
+    assert [p for _, p, _ in enviados] == ["secretaria"]
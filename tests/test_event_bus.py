@@ -0,0 +1,198 @@
+"""
+Barramento de eventos: backends Redis (fakeredis) e socket Unix.
+"""
+import json
+import multiprocessing
+import os
+import socket
+import threading
+
+import pytest
+
+import app
+
+
+def _com_origem(cls, origem, *args):
+    """Instância com origem fixa — simula outro worker no mesmo processo."""
+    sub = type(cls.__name__, (cls,), {"origem": property(lambda self: origem)})
+    return sub(*args)
+
+
+class Coletor:
+    def __init__(self):
+        self.eventos = []
+        self._novo   = threading.Event()
+
+    def __call__(self, evento, dados):
+        self.eventos.append((evento, dados))
+        self._novo.set()
+
+    def esperar(self, n=1, timeout=2.0):
+        while len(self.eventos) < n:
+            self._novo.clear()
+            if not self._novo.wait(timeout):
+                break
+        return self.eventos
+
+
+# ---------------------------------------------------------------- Redis
+
+@pytest.fixture
+def servidor_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+def _bus_redis(servidor, origem):
+    import fakeredis
+    return _com_origem(app.EventBusRedis, origem,
+                       fakeredis.FakeStrictRedis(server=servidor))
+
+
+def test_redis_entrega_entre_instancias(servidor_redis):
+    a = _bus_redis(servidor_redis, "host:1")
+    b = _bus_redis(servidor_redis, "host:2")
+    recebidos = Coletor()
+    b.assinar("alert.created", recebidos)
+    a.iniciar()
+    b.iniciar()
+
+    a.publicar("alert.created", {"alerta": {"id": 7}})
+    assert recebidos.esperar() == [("alert.created", {"alerta": {"id": 7}})]
+
+
+def test_redis_nao_reentrega_a_propria_mensagem(servidor_redis):
+    a = _bus_redis(servidor_redis, "host:1")
+    b = _bus_redis(servidor_redis, "host:2")
+    proprio, outro = Coletor(), Coletor()
+    a.assinar("*", proprio)
+    b.assinar("*", outro)
+    a.iniciar()
+    b.iniciar()
+
+    a.publicar("siren.changed", {"siren_on": True})
+    outro.esperar()
+    b.publicar("siren.changed", {"siren_on": False})   # marca o fim do fluxo
+    proprio.esperar(2)
+    # Entrega local imediata + a de b; o eco do Redis da própria origem é filtrado
+    assert proprio.eventos == [("siren.changed", {"siren_on": True}),
+                               ("siren.changed", {"siren_on": False})]
+
+
+# ---------------------------------------------------------- socket Unix
+
+unix = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="sem AF_UNIX")
+
+
+def _filho(diretorio, fila):
+    bus = app.EventBusUnix(diretorio)
+    bus.assinar("*", lambda evento, dados: fila.put((evento, dados)))
+    bus.iniciar()
+    fila.put("pronto")
+    threading.Event().wait(5)
+
+
+@unix
+def test_unix_entrega_entre_processos(tmp_path):
+    ctx   = multiprocessing.get_context("fork")
+    fila  = ctx.Queue()
+    filho = ctx.Process(target=_filho, args=(tmp_path / "bus", fila), daemon=True)
+    filho.start()
+    try:
+        assert fila.get(timeout=5) == "pronto"
+        bus = app.EventBusUnix(tmp_path / "bus")
+        bus.publicar("alerts.cleared", {"escola_id": "escola_001"})
+        assert fila.get(timeout=2) == ("alerts.cleared", {"escola_id": "escola_001"})
+    finally:
+        filho.terminate()
+        filho.join()
+
+
+def _enviar_bruto(destino, raw):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        s.sendto(raw, str(destino))
+    finally:
+        s.close()
+
+
+@unix
+def test_unix_filtra_origem_e_sobrevive_a_mensagem_invalida(tmp_path):
+    bus = app.EventBusUnix(tmp_path / "bus")
+    recebidos = Coletor()
+    bus.assinar("*", recebidos)
+    bus.iniciar()
+    destino = tmp_path / "bus" / f"{os.getpid()}.sock"
+
+    for raw in (b"[1]", b"nao-e-json", b'{"evento": [1]}',
+                json.dumps({"evento": "x", "dados": {}, "origem": bus.origem}).encode()):
+        _enviar_bruto(destino, raw)
+    _enviar_bruto(destino, json.dumps({"evento": "alert.resolved", "dados": {"escola_id": ""},
+                                       "origem": "outro:1"}).encode())
+
+    assert recebidos.esperar() == [("alert.resolved", {"escola_id": ""})]
+
+
+@unix
+def test_unix_remove_socket_de_worker_morto(tmp_path):
+    diretorio = tmp_path / "bus"
+    diretorio.mkdir(mode=0o700)
+    morto = diretorio / "999999.sock"
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    s.bind(str(morto))
+    s.close()  # o arquivo fica, mas ninguém escuta
+
+    bus = app.EventBusUnix(diretorio)
+    bus.publicar("siren.changed", {"siren_on": True})
+    assert not morto.exists()
+    assert (diretorio / f"{os.getpid()}.sock").exists()
+
+
+def test_receber_filtra_propria_origem():
+    bus = app.EventBusLocal()
+    recebidos = Coletor()
+    bus.assinar("*", recebidos)
+    bus._receber(json.dumps({"evento": "a", "dados": {}, "origem": bus.origem}))
+    bus._receber(json.dumps({"evento": "b", "dados": {}, "origem": "outro:1"}))
+    assert recebidos.eventos == [("b", {})]
+
+
+@pytest.mark.parametrize("raw", [b"[1]", b"1", b"null", b"{", b'{"evento": {"x": 1}}'])
+def test_receber_descarta_mensagem_malformada(raw):
+    bus = app.EventBusLocal()
+    recebidos = Coletor()
+    bus.assinar("*", recebidos)
+    bus._receber(raw)
+    assert recebidos.eventos == []
+
+
+# ---------------------------------------------------- diretório privado
+
+def test_diretorio_privado_corrige_permissoes(tmp_path):
+    d = tmp_path / "bus"
+    d.mkdir(mode=0o777)
+    os.chmod(d, 0o777)
+    assert app._diretorio_privado(d)
+    assert d.stat().st_mode & 0o777 == 0o700
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid") or os.getuid() != 0,
+                    reason="precisa de root para simular outro dono")
+def test_diretorio_de_outro_usuario_e_recusado(tmp_path):
+    d = tmp_path / "bus"
+    d.mkdir()
+    os.chown(d, 65534, 65534)
+    assert not app._diretorio_privado(d)
+
+    bus = app.EventBusUnix(d)
+    bus.iniciar()
+    bus.publicar("alerts.cleared", {})  # não deve criar socket nem falhar
+    assert list(d.iterdir()) == []
+
+
+def test_link_simbolico_e_recusado(tmp_path):
+    alvo = tmp_path / "alvo"
+    alvo.mkdir()
+    link = tmp_path / "bus"
+    link.symlink_to(alvo)
+    assert not app._diretorio_privado(link)
@@ -0,0 +1,78 @@
+"""
+MicroCache (/api/status anônimo): coalescência, invalidação e eventos.
+"""
+import threading
+
+import pytest
+
+import app
+
+
+def test_misses_simultaneos_calculam_uma_vez():
+    cache   = app.MicroCache(60)
+    liberar = threading.Event()
+    chamadas, resultados = [], []
+
+    def calcular():
+        chamadas.append(1)
+        liberar.wait(2)
+        return "valor"
+
+    threads = [threading.Thread(target=lambda: resultados.append(cache.obter("k", calcular)))
+               for _ in range(16)]
+    for t in threads:
+        t.start()
+    while not chamadas:
+        threading.Event().wait(0.001)
+    liberar.set()
+    for t in threads:
+        t.join(2)
+
+    assert len(chamadas) == 1
+    assert resultados == ["valor"] * 16
+    assert cache._travas == {}
+
+
+def test_invalidar_durante_calculo_forca_recalculo():
+    cache     = app.MicroCache(60)
+    calculando, liberar = threading.Event(), threading.Event()
+    versao = {"n": 1}
+
+    def lento():
+        valor = versao["n"]
+        calculando.set()
+        liberar.wait(2)
+        return valor
+
+    t = threading.Thread(target=lambda: cache.obter("k", lento))
+    t.start()
+    calculando.wait(2)
+    versao["n"] = 2
+    cache.invalidar()           # dado mudou enquanto o valor antigo era calculado
+    liberar.set()
+    t.join(2)
+
+    assert cache.obter("k", lambda: versao["n"]) == 2
+
+
+@pytest.mark.parametrize("evento", ["alert.created", "alert.resolved", "escolas.changed"])
+def test_evento_no_barramento_descarta_cache(evento):
+    bus   = app.EventBusLocal()
+    cache = app.MicroCache(60)
+    cache.assinar_eventos(bus, app.EVENTOS_STATUS_PUBLICO)
+    assert cache.obter("", lambda: 1) == 1
+    assert cache.obter("", lambda: 2) == 1
+
+    bus._receber(app.json.dumps({"evento": evento, "dados": {}, "origem": "outro:1"}))
+    assert cache.obter("", lambda: 3) == 3
+
+
+def test_status_publico_reflete_escola_cadastrada(cliente):
+    app.save_users({"admin": {"senha": "a", "perfil": "admin", "escola_id": None}})
+    app.save_escolas({})
+    assert cliente.get("/api/status").get_json()["total_escolas"] == 0
+
+    cliente.post("/login", data={"usuario": "admin", "senha": "a"})
+    cliente.post("/admin/escola/add", data={"nome": "Escola Nova"})
+    cliente.get("/logout")
+    assert cliente.get("/api/status").get_json()["total_escolas"] == 1
@@ -0,0 +1,55 @@
+"""
+Cache de páginas renderizadas: ETag por representação (identity/gzip) e 304.
+"""
+import pytest
+
+import app
+
+
+@pytest.fixture
+def cliente(cliente):
+    app.save_escolas({"escola_001": {"id": "escola_001", "nome": "Escola Teste"}})
+    return cliente
+
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_etag_e_cache_control(cliente):
+    r = cliente.get("/professor?escola=escola_001")
+    assert r.status_code == 200
+    assert r.headers["Cache-Control"] == app.CACHE_PUBLICO
+    assert r.get_etag()[0]
+    assert "Content-Encoding" not in r.headers
+
+
+def test_304_da_variante_gzip_tem_vary(cliente):
+    etag = cliente.get("/professor", headers=GZIP).headers["ETag"]
+    assert etag.endswith('-gzip"')
+    r = cliente.get("/professor", headers={**GZIP, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert "Accept-Encoding" in r.vary
+
+
+def test_etag_gzip_nao_valida_cliente_sem_gzip(cliente):
+    etag = cliente.get("/professor", headers=GZIP).headers["ETag"]
+    r = cliente.get("/professor", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert "Content-Encoding" not in r.headers
+    assert r.headers["ETag"] != etag
+
+
+def test_etag_identity_nao_valida_cliente_gzip(cliente):
+    etag = cliente.get("/professor").headers["ETag"]
+    r = cliente.get("/professor", headers={**GZIP, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["Content-Encoding"] == "gzip"
+
+
+def test_mudanca_em_escolas_gera_nova_pagina(cliente):
+    etag = cliente.get("/professor").headers["ETag"]
+    app.save_escolas({"escola_001": {"id": "escola_001", "nome": "Escola Renomeada"}})
+    r = cliente.get("/professor", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert "Escola Renomeada" in r.get_data(as_text=True)